@@ -1,3 +1,11 @@
+import heapq
+import os
+import tempfile
+from array import array
+from collections import Counter
+
+import numpy as np
+
 TEST_DATA = """
 3   4
 4   3
@@ -8,39 +16,143 @@ TEST_DATA = """
 """
 
 
-def solve_part1(data):
+def parse_input(data):
     left_list = []
     right_list = []
     for line in data.strip().splitlines():
         left, right = map(int, line.split())
         left_list.append(left)
         right_list.append(right)
-    left_list.sort()
-    right_list.sort()
-    total_distance = 0
-    for i in range(len(left_list)):
-        total_distance += abs(left_list[i] - right_list[i])
-    return total_distance
+    return left_list, right_list
 
 
-def solve_part2(data):
-    left_list = []
-    right_list = []
-    for line in data.strip().splitlines():
-        left, right = map(int, line.split())
-        left_list.append(left)
-        right_list.append(right)
-    similarity_score = 0
+def total_distance(left_list, right_list):
+    left_sorted = sorted(left_list)
+    right_sorted = sorted(right_list)
+    distance = 0
+    for left, right in zip(left_sorted, right_sorted):
+        distance += abs(left - right)
+    return distance
+
+
+def _spill_run(run, tmpdir):
+    # Sort one int64 run in place and write it to disk as packed 64-bit ints,
+    # without creating per-item Python ints
+    run.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmpdir)
+    with os.fdopen(fd, "wb") as f:
+        run.tofile(f)
+    return path
+
+
+def _iter_run(path, buffer_items):
+    # Read through one fixed buffer, refilled in place for every chunk
+    buf = array("q", [0]) * buffer_items
+    view = memoryview(buf)
+    # Unbuffered, so the file object adds no read buffer of its own
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(view) // buf.itemsize
+            if not n:
+                return
+            yield from view[:n]
+
+
+def _iter_lines(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as f:
+            yield from f
+    else:
+        yield from source
+
+
+def total_distance_external(source, memory_budget=64 * 1024 * 1024, tmpdir=None):
+    """
+    Compute the part 1 distance for inputs that do not fit in memory.
+    `source` is a path or an iterable of lines. Each column is collected into
+    sorted runs of packed int64 values that are spilled to disk, and the
+    distance is then taken over a k-way merge of the runs of both columns.
+    `memory_budget` (bytes) bounds the size of the in-memory runs and of the
+    read buffers used while merging.
+    """
+    itemsize = array("q").itemsize
+    # Two columns are buffered side by side while building runs
+    run_items = max(1, memory_budget // (2 * itemsize))
+
+    with tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        left_runs, right_runs = [], []
+        # Fixed-size run buffers, reused for every run and sorted in place
+        left_buf = np.empty(run_items, dtype=np.int64)
+        right_buf = np.empty(run_items, dtype=np.int64)
+        n = 0
+        for line in _iter_lines(source):
+            if not line.strip():
+                continue
+            left_buf[n], right_buf[n] = map(int, line.split())
+            n += 1
+            if n == run_items:
+                left_runs.append(_spill_run(left_buf, workdir))
+                right_runs.append(_spill_run(right_buf, workdir))
+                n = 0
+        if n:
+            left_runs.append(_spill_run(left_buf[:n], workdir))
+            right_runs.append(_spill_run(right_buf[:n], workdir))
+        del left_buf, right_buf
+
+        # Share the budget between the read buffers of every open run
+        buffer_items = max(1, memory_budget // (itemsize * 2 * max(1, len(left_runs))))
+        left_sorted = heapq.merge(*(_iter_run(p, buffer_items) for p in left_runs))
+        right_sorted = heapq.merge(*(_iter_run(p, buffer_items) for p in right_runs))
+
+        distance = 0
+        for left, right in zip(left_sorted, right_sorted):
+            distance += abs(left - right)
+        return distance
+
+
+def similarity_score(left_list, right_list):
+    # Build the frequency index of the right column once, then each lookup is O(1)
+    right_counts = Counter(right_list)
+    score = 0
     for num in left_list:
-        similarity_score += num * right_list.count(num)
-    return similarity_score
+        score += num * right_counts[num]
+    return score
+
+
+def similarity_score_numpy(left_list, right_list):
+    left = np.asarray(left_list, dtype=np.int64)
+    right = np.asarray(right_list, dtype=np.int64)
+    if left.size == 0 or right.size == 0:
+        return 0
+    values, counts = np.unique(right, return_counts=True)
+    # Locate each left value in the sorted unique right values
+    idx = np.searchsorted(values, left)
+    idx[idx == len(values)] = 0
+    matches = np.where(values[idx] == left, counts[idx], 0)
+    return int(np.dot(left, matches))
+
+
+def solve_part1(data):
+    left_list, right_list = parse_input(data)
+    return total_distance(left_list, right_list)
+
+
+def solve_part2(data, use_numpy=False):
+    left_list, right_list = parse_input(data)
+    if use_numpy:
+        return similarity_score_numpy(left_list, right_list)
+    return similarity_score(left_list, right_list)
 
 
 # Test cases for Part 1
 assert solve_part1(TEST_DATA) == 11
+assert total_distance_external(TEST_DATA.strip().splitlines()) == 11
+assert total_distance_external(TEST_DATA.strip().splitlines(), memory_budget=16) == 11
 
 # Test cases for Part 2
 assert solve_part2(TEST_DATA) == 31
+assert solve_part2(TEST_DATA, use_numpy=True) == 31
+assert similarity_score_numpy([1, 7], [3, 4]) == 0
 
 # Solve the puzzle with real data
 from aocd.models import Puzzle
@@ -48,8 +160,9 @@ from aocd.models import Puzzle
 puzzle = Puzzle(2024, 1)
 data = puzzle.input_data
 
-part1_solution = solve_part1(data)
-part2_solution = solve_part2(data)
+left_list, right_list = parse_input(data)
+part1_solution = total_distance(left_list, right_list)
+part2_solution = similarity_score(left_list, right_list)
 
 print("Part 1:", part1_solution)
 print("Part 2:", part2_solution)
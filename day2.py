@@ -1,3 +1,5 @@
+import numpy as np
+
 TEST_DATA = """7 6 4 2 1
 1 2 7 8 9
 9 7 6 2 1
@@ -13,6 +15,56 @@ def check_safe(levels):
     return False
 
 
+def _step_ok(a, b, sign):
+    return 1 <= (b - a) * sign <= 3
+
+
+def _first_violation(levels, sign, skip=-1):
+    # Index of the left element of the first bad pair, ignoring index `skip`
+    prev = -1
+    for i in range(len(levels)):
+        if i == skip:
+            continue
+        if prev >= 0 and not _step_ok(levels[prev], levels[i], sign):
+            return prev, i
+        prev = i
+    return None
+
+
+def _min_removals(levels, sign, tolerance):
+    # removals[i]: fewest removals among levels[:i] so that the kept levels end
+    # at i and form a valid run. Only the previous tolerance + 1 levels can be
+    # the preceding kept level, so this is O(k * tolerance).
+    n = len(levels)
+    removals = [0] * n
+    best = n
+    for i in range(n):
+        removals[i] = i
+        for j in range(max(0, i - tolerance - 1), i):
+            if _step_ok(levels[j], levels[i], sign):
+                removals[i] = min(removals[i], removals[j] + i - j - 1)
+        best = min(best, removals[i] + n - 1 - i)
+    return best
+
+
+def check_safe_dampened(levels, tolerance=1):
+    """Return True if removing at most `tolerance` levels makes the report safe."""
+    if len(levels) <= tolerance + 1:
+        return True
+    for sign in (1, -1):
+        if tolerance == 1:
+            violation = _first_violation(levels, sign)
+            if violation is None:
+                return True
+            # One of the two levels of the first bad pair has to go
+            for skip in violation:
+                if _first_violation(levels, sign, skip) is None:
+                    return True
+        elif _min_removals(levels, sign, tolerance) <= tolerance:
+            return True
+    return False
+
+
 def solve1(data):
     reports = data.strip().splitlines()
     safe_count = 0
@@ -23,22 +75,81 @@ def solve1(data):
     return safe_count
 
 
-def solve2(data):
+def solve2(data, tolerance=1):
     reports = data.strip().splitlines()
     safe_count = 0
     for report in reports:
         levels = list(map(int, report.split()))
-        if check_safe(levels):
+        if check_safe_dampened(levels, tolerance):
             safe_count += 1
-        else:
-            for i in range(len(levels)):
-                temp_levels = levels[:i] + levels[i + 1 :]
-                if check_safe(temp_levels):
-                    safe_count += 1
-                    break
     return safe_count
 
 
+def pack_reports(data):
+    """Pack every report into one flat level array plus CSR-style offsets."""
+    reports = [list(map(int, line.split())) for line in data.strip().splitlines()]
+    reports = [levels for levels in reports if levels]
+    lengths = np.fromiter((len(levels) for levels in reports), dtype=np.int64)
+    offsets = np.zeros(len(reports) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    values = np.fromiter(
+        (level for levels in reports for level in levels),
+        dtype=np.int64,
+        count=int(offsets[-1]),
+    )
+    return values, offsets
+
+
+def count_safe_batch(values, offsets):
+    """
+    Count safe reports without and with the single-level dampener.
+    Every pair and every possible removal is evaluated with array operations
+    over all reports at once.
+    """
+    n_reports = len(offsets) - 1
+    if n_reports == 0:
+        return 0, 0
+    report_id = np.repeat(np.arange(n_reports), np.diff(offsets))
+    same_report = report_id[1:] == report_id[:-1]
+    # An interior level can be removed, leaving a bridging pair around it
+    has_left = np.zeros(len(values), dtype=bool)
+    has_left[1:] = same_report
+    has_right = np.zeros(len(values), dtype=bool)
+    has_right[:-1] = same_report
+    interior = has_left & has_right
+
+    diffs = np.diff(values)
+    bridge_diffs = np.zeros(len(values), dtype=np.int64)
+    bridge_diffs[1:-1] = values[2:] - values[:-2]
+
+    safe = np.zeros(n_reports, dtype=bool)
+    dampened = np.zeros(n_reports, dtype=bool)
+    for sign in (1, -1):
+        step = diffs * sign
+        bad = same_report & ((step < 1) | (step > 3))
+        bad_count = np.bincount(report_id[:-1], weights=bad, minlength=n_reports)
+        safe |= bad_count == 0
+
+        # Bad pairs that disappear when a level is removed
+        bad_left = np.zeros(len(values))
+        bad_left[1:] = bad
+        bad_right = np.zeros(len(values))
+        bad_right[:-1] = bad
+        bridge = bridge_diffs * sign
+        bridge_ok = ~interior | ((bridge >= 1) & (bridge <= 3))
+        removal_safe = (bad_count[report_id] - bad_left - bad_right == 0) & bridge_ok
+        dampened |= (
+            np.bincount(report_id, weights=removal_safe, minlength=n_reports) > 0
+        )
+
+    return int(safe.sum()), int((safe | dampened).sum())
+
+
+def solve_batch(data):
+    values, offsets = pack_reports(data)
+    return count_safe_batch(values, offsets)
+
+
 assert solve1(TEST_DATA) == 2
 assert check_safe([7, 6, 4, 2, 1]) == True
 assert check_safe([1, 2, 7, 8, 9]) == False
@@ -48,6 +159,16 @@ assert check_safe([8, 6, 4, 4, 1]) == False
 assert check_safe([1, 3, 6, 7, 9]) == True
 
 assert solve2(TEST_DATA) == 4
+assert solve2(TEST_DATA, tolerance=0) == 2
+assert solve2(TEST_DATA, tolerance=2) == 6
+assert check_safe_dampened([1, 5, 2, 3, 4]) == True
+assert check_safe_dampened([5, 1, 2, 3, 4]) == True
+assert check_safe_dampened([1, 2, 3, 4, 9]) == True
+assert check_safe_dampened([1, 9, 9, 2, 3], tolerance=1) == False
+assert check_safe_dampened([1, 9, 9, 2, 3], tolerance=2) == True
+
+assert solve_batch(TEST_DATA) == (2, 4)
+assert solve_batch("5\n1 9\n1 9 2") == (1, 3)
 
 from aocd.models import Puzzle
 
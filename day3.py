@@ -1,4 +1,8 @@
+import io
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from aocd.models import Puzzle
 
 TEST_DATA = """
@@ -33,6 +37,140 @@ def solve_part2(data):
     return total
 
 
+TOKEN_RE = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|do\(\)|don't\(\)")
+# Longest possible token, mul(999,999); a match starting further than this
+# from the end of the buffer cannot change when more data arrives
+MAX_TOKEN_LEN = len(b"mul(999,999)")
+
+
+def iter_chunks(source, chunk_size):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from iter_chunks(f, chunk_size)
+        return
+    # File objects and mmap objects both support read(n)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        yield chunk
+
+
+def evaluate_chunk(buf, limit):
+    """
+    Evaluate the tokens of `buf` that start before `limit` without knowing the
+    do()/don't() state at the start of the chunk.
+    Returns (part1 total, part2 total if enabled at start, part2 total if
+    disabled at start, final state or None if the chunk never toggles it,
+    offset just past the last consumed token).
+    """
+    total_part1 = 0
+    # Products before the first do()/don't() only count if enabled at start
+    prefix = 0
+    rest = 0
+    state = None
+    resume = 0
+    for match in TOKEN_RE.finditer(buf):
+        if match.start() >= limit:
+            break
+        instruction = match.group(0)
+        if instruction == b"do()":
+            state = True
+        elif instruction == b"don't()":
+            state = False
+        else:
+            product = int(match.group(1)) * int(match.group(2))
+            total_part1 += product
+            if state is None:
+                prefix += product
+            elif state:
+                rest += product
+        resume = match.end()
+    return total_part1, prefix + rest, rest, state, resume
+
+
+def scan_stream(source, chunk_size=64 * 1024):
+    """
+    Compute both parts over a file path, file object or mmap while holding
+    only one chunk (plus a short tail) in memory at a time.
+    """
+    total_part1 = 0
+    total_part2 = 0
+    enabled = True
+    carry = b""
+
+    def consume(buf, limit):
+        nonlocal total_part1, total_part2, enabled
+        part1, if_enabled, if_disabled, state, resume = evaluate_chunk(buf, limit)
+        total_part1 += part1
+        total_part2 += if_enabled if enabled else if_disabled
+        if state is not None:
+            enabled = state
+        return resume
+
+    for chunk in iter_chunks(source, chunk_size):
+        buf = carry + chunk
+        # Tokens starting in the last MAX_TOKEN_LEN - 1 bytes may be incomplete
+        cut = len(buf) - (MAX_TOKEN_LEN - 1)
+        resume = consume(buf, cut)
+        carry = buf[max(cut, resume, 0) :]
+    consume(carry, len(carry))
+    return total_part1, total_part2
+
+
+def _evaluate_range(path, start, end):
+    # Each range owns the tokens starting in [start, end) and reads just far
+    # enough past `end` to finish them, so any offset is a safe split point
+    with open(path, "rb") as f:
+        f.seek(start)
+        buf = f.read(end + MAX_TOKEN_LEN - 1 - start)
+    return evaluate_chunk(buf, end - start)[:4]
+
+
+def _evaluate_slice(buf, limit):
+    return evaluate_chunk(buf, limit)[:4]
+
+
+def solve_parallel(source, workers=None, chunk_size=16 * 1024 * 1024):
+    """
+    Compute both parts by evaluating byte ranges in a process pool and
+    chaining the per-range do()/don't() states afterwards.
+    `source` is a file path or the puzzle input as bytes.
+    """
+    size = len(source) if isinstance(source, bytes) else os.path.getsize(source)
+    workers = workers or os.cpu_count() or 1
+    total_part1 = 0
+    total_part2 = 0
+    enabled = True
+
+    def combine(result):
+        nonlocal total_part1, total_part2, enabled
+        part1, if_enabled, if_disabled, state = result
+        total_part1 += part1
+        total_part2 += if_enabled if enabled else if_disabled
+        if state is not None:
+            enabled = state
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start in range(0, size, chunk_size):
+            end = min(start + chunk_size, size)
+            if isinstance(source, bytes):
+                # Ship only this range (plus its token tail), not the whole input
+                buf = source[start : end + MAX_TOKEN_LEN - 1]
+                pending.append(executor.submit(_evaluate_slice, buf, end - start))
+            else:
+                pending.append(executor.submit(_evaluate_range, source, start, end))
+            # Keep a bounded number of slices in flight, combining in order
+            if len(pending) >= 2 * workers:
+                combine(pending.popleft().result())
+        while pending:
+            combine(pending.popleft().result())
+    return total_part1, total_part2
+
+
 # Test cases for Part 1
 def test_part1():
     assert solve_part1(TEST_DATA) == 161
@@ -45,16 +183,36 @@ def test_part2():
     print("Part 2 tests passed")
 
 
-# Run tests
-test_part1()
-test_part2()
+# Streaming scanner, with tokens split across every possible chunk boundary
+def test_streaming():
+    for chunk_size in range(1, 20):
+        stream = io.BytesIO(TEST_DATA.encode())
+        assert scan_stream(stream, chunk_size)[0] == 161
+        stream = io.StringIO(TEST_DATA_2)
+        assert scan_stream(stream, chunk_size) == (161, 48)
+    print("Streaming tests passed")
+
+
+def test_parallel():
+    for chunk_size in (1, 5, 11, 1000):
+        data = TEST_DATA_2.encode()
+        assert solve_parallel(data, workers=2, chunk_size=chunk_size) == (161, 48)
+    print("Parallel tests passed")
+
+
+if __name__ == "__main__":
+    # Run tests
+    test_part1()
+    test_part2()
+    test_streaming()
+    test_parallel()
 
-# Solve the real puzzle
-puzzle = Puzzle(2024, 3)
-p1 = solve_part1(puzzle.input_data)
-print(f"Part 1: {p1}")
-puzzle.answer_a = p1
+    # Solve the real puzzle
+    puzzle = Puzzle(2024, 3)
+    p1 = solve_part1(puzzle.input_data)
+    print(f"Part 1: {p1}")
+    puzzle.answer_a = p1
 
-p2 = solve_part2(puzzle.input_data)
-print(f"Part 2: {p2}")
-puzzle.answer_b = p2
+    p2 = solve_part2(puzzle.input_data)
+    print(f"Part 2: {p2}")
+    puzzle.answer_b = p2
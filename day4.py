@@ -1,3 +1,6 @@
+from collections import deque
+
+import numpy as np
 from aocd.models import Puzzle
 
 TEST_DATA = """
@@ -65,9 +68,195 @@ def solve_part2(data, word="MAS"):
     return count
 
 
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1), (0, -1), (-1, 0), (-1, -1), (-1, 1)]
+
+
+def to_array(data):
+    lines = data.strip().splitlines()
+    return np.frombuffer("".join(lines).encode(), dtype=np.uint8).reshape(
+        len(lines), -1
+    )
+
+
+def _word_mask(grid, word, dr, dc):
+    # Boolean mask over start cells whose letters along (dr, dc) spell `word`
+    rows, cols = grid.shape
+    span = len(word) - 1
+    r_lo, r_hi = max(0, -dr * span), rows - max(0, dr * span)
+    c_lo, c_hi = max(0, -dc * span), cols - max(0, dc * span)
+    if r_hi <= r_lo or c_hi <= c_lo:
+        return np.zeros((0, 0), dtype=bool)
+    mask = np.ones((r_hi - r_lo, c_hi - c_lo), dtype=bool)
+    for i, ch in enumerate(word.encode()):
+        mask &= grid[r_lo + dr * i : r_hi + dr * i, c_lo + dc * i : c_hi + dc * i] == ch
+    return mask
+
+
+def count_word(grid, word="XMAS"):
+    return int(sum(_word_mask(grid, word, dr, dc).sum() for dr, dc in DIRECTIONS))
+
+
+def count_x_pattern(grid, word="MAS"):
+    if len(word) % 2 == 0:
+        raise ValueError("X pattern needs an odd-length word")
+    rows, cols = grid.shape
+    half = len(word) // 2
+    if rows < len(word) or cols < len(word):
+        return 0
+    arms = [word, word[::-1]]
+    # Matches along each diagonal through every possible center, indexed by
+    # the top-left (down-right arm) or top-right (down-left arm) corner
+    down_right = np.zeros((rows - 2 * half, cols - 2 * half), dtype=np.int64)
+    down_left = np.zeros_like(down_right)
+    for arm in arms:
+        down_right += _word_mask(grid, arm, 1, 1)
+        down_left += _word_mask(grid, arm, 1, -1)
+    return int((down_right * down_left).sum())
+
+
+def solve_part1_numpy(data, word="XMAS"):
+    return count_word(to_array(data), word)
+
+
+def solve_part2_numpy(data, word="MAS"):
+    return count_x_pattern(to_array(data), word)
+
+
+def _iter_rows(lines):
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield np.frombuffer(line.encode(), dtype=np.uint8)
+
+
+def count_word_stream(lines, word="XMAS"):
+    """
+    Count `word` in all 8 directions over an iterable of rows (e.g. an open
+    file), keeping only the last len(word) rows. Each match is counted when
+    the lower of its end rows arrives.
+    """
+    window = deque(maxlen=len(word))
+    count = 0
+    for row in _iter_rows(lines):
+        window.append(row)
+        # A full window holds exactly the rows a vertical or diagonal match
+        # ending in the newest row can span
+        block = np.stack(window) if len(window) == len(word) else None
+        for dr, dc in DIRECTIONS:
+            if dr == 0:
+                count += int(_word_mask(row[None, :], word, dr, dc).sum())
+            elif block is not None:
+                count += int(_word_mask(block, word, dr, dc).sum())
+    return count
+
+
+def count_x_pattern_stream(lines, word="MAS"):
+    window = deque(maxlen=len(word))
+    count = 0
+    for row in _iter_rows(lines):
+        window.append(row)
+        if len(window) == len(word):
+            count += count_x_pattern(np.stack(window), word)
+    return count
+
+
+def build_automaton(words):
+    """
+    Build an Aho-Corasick automaton for `words`.
+    Returns (goto, fail, output) where goto[state] maps a letter to the next
+    state and output[state] lists the indices of words ending at that state.
+    """
+    goto = [{}]
+    fail = [0]
+    output = [[]]
+    for index, word in enumerate(words):
+        state = 0
+        for ch in word:
+            if ch not in goto[state]:
+                goto.append({})
+                fail.append(0)
+                output.append([])
+                goto[state][ch] = len(goto) - 1
+            state = goto[state][ch]
+        output[state].append(index)
+
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, child in goto[state].items():
+            queue.append(child)
+            f = fail[state]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[child] = goto[f].get(ch, 0)
+            output[child] = output[child] + output[fail[child]]
+    return goto, fail, output
+
+
+def _grid_lines(rows, cols):
+    # Every row, column, diagonal and anti-diagonal as (start, step, length)
+    for r in range(rows):
+        yield (r, 0), (0, 1), cols
+    for c in range(cols):
+        yield (0, c), (1, 0), rows
+    for start in [(r, 0) for r in range(rows)] + [(0, c) for c in range(1, cols)]:
+        yield start, (1, 1), min(rows - start[0], cols - start[1])
+    for start in [(0, c) for c in range(cols)] + [
+        (r, cols - 1) for r in range(1, rows)
+    ]:
+        yield start, (1, -1), min(rows - start[0], start[1] + 1)
+
+
+def search_words(data, words, positions=False):
+    """
+    Count every occurrence of each word in all 8 directions with one pass of
+    an Aho-Corasick automaton over each grid line, forward and reversed.
+    Returns {word: count}, or ({word: count}, {word: [(r, c, dr, dc), ...]})
+    with the start cell and direction of each match when `positions` is set.
+    """
+    words = list(dict.fromkeys(words))
+    goto, fail, output = build_automaton(words)
+    grid = data.strip().splitlines()
+    rows, cols = len(grid), len(grid[0])
+    counts = [0] * len(words)
+    found = [[] for _ in words]
+
+    for (r0, c0), (dr, dc), length in _grid_lines(rows, cols):
+        for reverse in (False, True):
+            if reverse:
+                r0, c0 = r0 + dr * (length - 1), c0 + dc * (length - 1)
+                dr, dc = -dr, -dc
+            state = 0
+            for i in range(length):
+                ch = grid[r0 + dr * i][c0 + dc * i]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+                for index in output[state]:
+                    counts[index] += 1
+                    if positions:
+                        start = i - len(words[index]) + 1
+                        found[index].append((r0 + dr * start, c0 + dc * start, dr, dc))
+
+    counts = dict(zip(words, counts))
+    if positions:
+        return counts, dict(zip(words, found))
+    return counts
+
+
 # Test cases
 assert solve_part1(TEST_DATA) == 18
 assert solve_part2(TEST_DATA) == 9
+assert solve_part1_numpy(TEST_DATA) == 18
+assert solve_part2_numpy(TEST_DATA) == 9
+assert count_word_stream(TEST_DATA.splitlines()) == 18
+assert count_word_stream(TEST_DATA.splitlines(), word="X") == 8 * 19
+assert count_x_pattern_stream(TEST_DATA.splitlines()) == 9
+assert search_words(TEST_DATA, ["XMAS", "MAS", "SAMX"]) == {
+    "XMAS": 18,
+    "MAS": solve_part1(TEST_DATA, word="MAS"),
+    "SAMX": 18,
+}
 
 # Solve the real puzzle
 puzzle = Puzzle(2024, 4)
@@ -1,3 +1,6 @@
+import heapq
+from functools import cmp_to_key
+
 from aocd.models import Puzzle
 
 TEST_DATA = """
@@ -45,13 +48,23 @@ def parse_input(data):
     return rules, updates
 
 
-def is_update_correct(rules, update):
-    position = {page: idx for idx, page in enumerate(update)}
-    # Only consider rules where both pages are in the update
-    relevant_rules = [(a, b) for a, b in rules if a in position and b in position]
-    for a, b in relevant_rules:
-        if position[a] >= position[b]:
-            return False
+def compile_rules(rules):
+    # Set of (a, b) pairs meaning "a must precede b", for O(1) lookups
+    return frozenset(rules)
+
+
+def is_update_correct(rules, update, adjacent_only=False):
+    """
+    Check an update against compiled rules (see compile_rules).
+    With `adjacent_only`, only neighbouring pages are checked, which is enough
+    when the rules for the update's pages form a total order.
+    """
+    if adjacent_only:
+        return all((b, a) not in rules for a, b in zip(update, update[1:]))
+    for i, a in enumerate(update):
+        for b in update[i + 1 :]:
+            if (b, a) in rules:
+                return False
     return True
 
 
@@ -68,39 +81,80 @@ def reorder_update(rules, update):
         graph[page] = []
         in_degree[page] = 0
 
-    update_set = set(update)
-    for a, b in rules:
-        if a in update_set and b in update_set:
-            graph[a].append(b)
-            in_degree[b] += 1
+    for a in update:
+        for b in update:
+            if (a, b) in rules:
+                graph[a].append(b)
+                in_degree[b] += 1
 
-    # Kahn's algorithm with priority queue (sort nodes in reverse order)
-    # to match the expected reordering
-    queue = [page for page in update if in_degree[page] == 0]
-    queue.sort(reverse=True)  # Higher page numbers first
+    # Kahn's algorithm with a max-heap (negated pages) so that the highest
+    # ready page number is emitted first, to match the expected reordering
+    queue = [-page for page in update if in_degree[page] == 0]
+    heapq.heapify(queue)
     sorted_update = []
     while queue:
-        node = queue.pop(0)
+        node = -heapq.heappop(queue)
         sorted_update.append(node)
         for neighbor in graph[node]:
             in_degree[neighbor] -= 1
             if in_degree[neighbor] == 0:
-                queue.append(neighbor)
-        queue.sort(reverse=True)
+                heapq.heappush(queue, -neighbor)
     if len(sorted_update) != len(update):
         raise Exception("Cycle detected in the rules!")
     return sorted_update
 
 
-def solve(data):
+def _page_order(rules):
+    def compare(a, b):
+        if (a, b) in rules:
+            return -1
+        if (b, a) in rules:
+            return 1
+        return 0
+
+    return compare
+
+
+def reorder_update_sorted(rules, update):
+    # Only valid when the rules for the update's pages form a total order
+    return sorted(update, key=cmp_to_key(_page_order(rules)))
+
+
+def select_middle_page(rules, update):
+    """
+    Quickselect the middle page of the reordered update without fully
+    ordering it. Like reorder_update_sorted, this assumes a total order.
+    """
+    compare = _page_order(rules)
+    pages = list(update)
+    k = len(pages) // 2
+    while True:
+        pivot = pages[len(pages) // 2]
+        before = [p for p in pages if compare(p, pivot) < 0]
+        after = [p for p in pages if compare(p, pivot) > 0]
+        equal = len(pages) - len(before) - len(after)
+        if k < len(before):
+            pages = before
+        elif k < len(before) + equal:
+            return pivot
+        else:
+            k -= len(before) + equal
+            pages = after
+
+
+def solve(data, total_order=False):
     rules, updates = parse_input(data)
+    rules = compile_rules(rules)
     total_part1 = 0
     total_part2 = 0
     for update in updates:
-        if is_update_correct(rules, update):
+        if is_update_correct(rules, update, adjacent_only=total_order):
             # Part 1: Correctly ordered updates
             middle_page = get_middle_page(update)
             total_part1 += middle_page
+        elif total_order:
+            # Part 2: only the middle page of the reordering is needed
+            total_part2 += select_middle_page(rules, update)
         else:
             # Part 2: Incorrectly ordered updates, reorder them
             sorted_update = reorder_update(rules, update)
@@ -109,10 +163,129 @@ def solve(data):
     return total_part1, total_part2
 
 
+class UpdateStore:
+    """
+    Rules and updates with part 1/part 2 totals kept up to date as rules are
+    added or removed. An inverted index from page to the updates containing
+    it limits revalidation to the updates a rule change can affect.
+    """
+
+    def __init__(self, rules=(), updates=()):
+        self.rules = set()
+        self.updates = []
+        self.page_index = {}
+        # Per update: (part 1 contribution, part 2 contribution)
+        self.contributions = []
+        self.dirty = set()
+        self.total_part1 = 0
+        self.total_part2 = 0
+        for update in updates:
+            self.add_update(update)
+        for a, b in rules:
+            self.add_rule(a, b)
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(*parse_input(data))
+
+    def add_update(self, update):
+        # Reject an update whose pages already form a cycle under the rules,
+        # before it is indexed or marked dirty
+        for a in update:
+            for b in update:
+                if (a, b) in self.rules and self._reaches(b, a, update):
+                    raise ValueError("Cycle detected in the rules!")
+        index = len(self.updates)
+        self.updates.append(list(update))
+        self.contributions.append((0, 0))
+        for page in update:
+            self.page_index.setdefault(page, set()).add(index)
+        self.dirty.add(index)
+        return index
+
+    def _affected(self, a, b):
+        return self.page_index.get(a, set()) & self.page_index.get(b, set())
+
+    def _reaches(self, start, target, pages):
+        # Depth-first search along rules restricted to one update's pages
+        stack = [start]
+        seen = {start}
+        while stack:
+            page = stack.pop()
+            if page == target:
+                return True
+            for other in pages:
+                if other not in seen and (page, other) in self.rules:
+                    seen.add(other)
+                    stack.append(other)
+        return False
+
+    def add_rule(self, a, b):
+        if (a, b) in self.rules:
+            return
+        affected = self._affected(a, b)
+        for index in affected:
+            if self._reaches(b, a, self.updates[index]):
+                raise ValueError("Cycle detected in the rules!")
+        self.rules.add((a, b))
+        self.dirty |= affected
+
+    def remove_rule(self, a, b):
+        if (a, b) not in self.rules:
+            return
+        self.rules.remove((a, b))
+        self.dirty |= self._affected(a, b)
+
+    def totals(self):
+        for index in self.dirty:
+            old_part1, old_part2 = self.contributions[index]
+            update = self.updates[index]
+            if is_update_correct(self.rules, update):
+                new = (get_middle_page(update), 0)
+            else:
+                new = (0, get_middle_page(reorder_update(self.rules, update)))
+            self.contributions[index] = new
+            self.total_part1 += new[0] - old_part1
+            self.total_part2 += new[1] - old_part2
+        self.dirty.clear()
+        return self.total_part1, self.total_part2
+
+
 # Test cases
 total_p1, total_p2 = solve(TEST_DATA)
 assert total_p1 == 143, f"Expected Part 1 total 143, got {total_p1}"
 assert total_p2 == 123, f"Expected Part 2 total 123, got {total_p2}"
+assert solve(TEST_DATA, total_order=True) == (143, 123)
+rules, updates = parse_input(TEST_DATA)
+rules = compile_rules(rules)
+for update in updates:
+    assert is_update_correct(rules, update) == is_update_correct(
+        rules, update, adjacent_only=True
+    )
+    assert reorder_update(rules, update) == reorder_update_sorted(rules, update)
+    assert get_middle_page(reorder_update(rules, update)) == select_middle_page(
+        rules, update
+    )
+store = UpdateStore.from_data(TEST_DATA)
+assert store.totals() == (143, 123)
+store.remove_rule(75, 47)
+store.add_rule(47, 75)
+assert store.totals() == solve(TEST_DATA.replace("75|47", "47|75"))
+try:
+    store.add_rule(75, 47)
+    assert False, "Expected a cycle to be detected"
+except ValueError:
+    pass
+assert store.totals() == solve(TEST_DATA.replace("75|47", "47|75"))
+store.add_rule(13, 99)
+store.add_rule(99, 61)
+try:
+    store.add_update([61, 13, 99])
+    assert False, "Expected a cycle to be detected"
+except ValueError:
+    pass
+assert len(store.updates) == 6
+assert store.totals() == solve(TEST_DATA.replace("75|47", "47|75"))
 print("All test cases passed!")
 
 # Solve the real puzzle
@@ -1,5 +1,10 @@
 from aocd.models import Puzzle
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from multiprocessing import shared_memory
+import os
 import threading
+import numpy as np
 import sys
 import sysconfig
 
@@ -48,12 +53,21 @@ def turn_right(d):
 
 
 def simulate_no_obstacle(grid, start_pos, start_dir):
+    """
+    Walk the unobstructed path.
+    Returns (visited cell count, moves, first_visits, turn_states) where
+    first_visits maps each entered cell to (pos, d, n): the guard stood on
+    pos facing d just before entering it, and turn_states[:n] are the
+    encoded segment-start states (the start and every turn) before that.
+    """
     rows, cols = len(grid), len(grid[0])
     r, c = start_pos
     d = start_dir
     visited = set()
     visited.add((r, c))
     moves = []
+    first_visits = {}
+    turn_states = [encode_state(r, c, d, cols)]
 
     while True:
         forward_status = can_move_forward(grid, rows, cols, r, c, d)
@@ -61,14 +75,21 @@ def simulate_no_obstacle(grid, start_pos, start_dir):
             break
         if forward_status is False:
             d = turn_right(d)
+            turn_states.append(encode_state(r, c, d, cols))
             continue
 
-        r += DR[d]
-        c += DC[d]
+        nr, nc = r + DR[d], c + DC[d]
+        if (nr, nc) not in first_visits:
+            # The resume state itself must not be seeded as already visited
+            n = len(turn_states)
+            if turn_states[-1] == encode_state(r, c, d, cols):
+                n -= 1
+            first_visits[(nr, nc)] = ((r, c), d, n)
+        r, c = nr, nc
         moves.append((r, c))
         visited.add((r, c))
 
-    return len(visited), moves
+    return len(visited), moves, first_visits, turn_states
 
 
 def encode_state(r, c, d, cols):
@@ -105,22 +126,239 @@ def simulate_with_loop_detection(grid, start_pos, start_dir, obstacle_cell):
         r, c = nr, nc
 
 
-def worker(grid, start_pos, start_dir, candidate_cells_chunk, result_list, index):
+def build_jump_table(grid):
+    """
+    For every (r, c, d) state, the cell index (r * cols + c) where the guard
+    stops in front of the next obstacle, or -1 if it walks off the map.
+    Indexed with encode_state.
+    """
+    rows, cols = len(grid), len(grid[0])
+    table = [-1] * (rows * cols * 4)
+    for d in range(4):
+        # Sweep each line from the edge the guard is heading towards
+        r_range = range(rows) if DR[d] <= 0 else range(rows - 1, -1, -1)
+        c_range = range(cols) if DC[d] <= 0 else range(cols - 1, -1, -1)
+        if DC[d] == 0:
+            lines = [[(r, c) for r in r_range] for c in range(cols)]
+        else:
+            lines = [[(r, c) for c in c_range] for r in range(rows)]
+        for line in lines:
+            stop = -1
+            for r, c in line:
+                if grid[r][c] == "#":
+                    # Cells behind this obstacle stop on the cell before it
+                    stop = (r - DR[d]) * cols + (c - DC[d])
+                else:
+                    table[encode_state(r, c, d, cols)] = stop
+    return table
+
+
+def simulate_with_jumps(
+    grid, jump_table, start_pos, start_dir, obstacle_cell, seed_states=()
+):
+    """
+    Loop detection that only visits turn points, using a jump table built by
+    build_jump_table. The extra obstacle is patched in on the fly: it only
+    changes a jump whose straight segment crosses it.
+    """
+    cols = len(grid[0])
+    orow, ocol = obstacle_cell
+    r, c = start_pos
+    d = start_dir
+    visited = set(seed_states)
+
+    while True:
+        state = encode_state(r, c, d, cols)
+        if state in visited:
+            return True
+        visited.add(state)
+
+        stop = jump_table[state]
+        dr, dc = DR[d], DC[d]
+        # Distance to the extra obstacle if it lies straight ahead
+        if (dc == 0 and ocol == c) or (dr == 0 and orow == r):
+            ahead = (orow - r) * dr + (ocol - c) * dc
+            if ahead > 0 and (
+                stop == -1 or ahead <= (stop // cols - r) * dr + (stop % cols - c) * dc
+            ):
+                stop = (orow - dr) * cols + (ocol - dc)
+        if stop == -1:
+            return False
+        r, c = divmod(stop, cols)
+        d = turn_right(d)
+
+
+def candidate_starts(grid, start_pos, start_dir):
+    """
+    For every candidate obstacle cell on the unobstructed path, the state to
+    resume from (just before the guard first reaches it) and the encoded
+    states already visited before then: (cell, pos, d, seed_states).
+    The path up to that point is the same with or without the obstacle.
+    """
+    _, _, first_visits, turn_states = simulate_no_obstacle(grid, start_pos, start_dir)
+    return [
+        (cell, pos, d, turn_states[:n])
+        for cell, (pos, d, n) in first_visits.items()
+        if cell != start_pos
+    ]
+
+
+OUTSIDE = 0
+WALL = ord("#")
+
+
+def pad_grid(grid):
+    # Flat bytearray copy of the grid with an OUTSIDE border, and its width
+    rows, cols = len(grid), len(grid[0])
+    width = cols + 2
+    cells = bytearray([OUTSIDE]) * ((rows + 2) * width)
+    for r, row in enumerate(grid):
+        start = (r + 1) * width + 1
+        cells[start : start + cols] = "".join(row).encode()
+    return cells, width
+
+
+class LoopDetector:
+    """
+    Reusable loop detection over a padded grid buffer from pad_grid (a
+    bytearray, or a shared memory view of one) and its row width.
+    The grid is padded with an OUTSIDE border, so the guard
+    leaving the map is just another cell value and needs no bounds checks.
+    Positions are flat indexes moved by per-direction deltas. The visited
+    buffer is stamped with a generation number per simulation, so it is
+    allocated once per worker and never cleared.
+    """
+
+    def __init__(self, cells, width):
+        self.cells = cells
+        self.width = width
+        self.cols = width - 2
+        self.deltas = [DR[d] * self.width + DC[d] for d in range(4)]
+        self.visited = array("I", bytes(len(self.cells) * 4 * 4))
+        self.generation = 0
+
+    @classmethod
+    def from_grid(cls, grid):
+        return cls(*pad_grid(grid))
+
+    def flat(self, r, c):
+        return (r + 1) * self.width + (c + 1)
+
+    def is_loop(self, start_pos, start_dir, obstacle_cell, seed_states=()):
+        self.generation += 1
+        if self.generation == 2**32:
+            # Stamps would wrap around, start again from a clean buffer
+            self.visited = array("I", bytes(len(self.visited) * 4))
+            self.generation = 1
+        generation = self.generation
+        visited = self.visited
+        cells = self.cells
+        deltas = self.deltas
+
+        for state in seed_states:
+            # Seeds use encode_state on the unpadded grid
+            cell, d = divmod(state, 4)
+            r, c = divmod(cell, self.cols)
+            visited[self.flat(r, c) * 4 + d] = generation
+
+        pos = self.flat(*start_pos)
+        d = start_dir
+        obstacle = self.flat(*obstacle_cell)
+        while True:
+            s = pos * 4 + d
+            if visited[s] == generation:
+                return True
+            visited[s] = generation
+
+            nxt = pos + deltas[d]
+            cell = cells[nxt]
+            if cell == OUTSIDE:
+                return False
+            if cell == WALL or nxt == obstacle:
+                d = (d + 1) & 3
+                continue
+            pos = nxt
+
+
+def worker(grid, candidate_cells_chunk, result_list, index):
+    detector = LoopDetector.from_grid(grid)
     count = 0
-    for cell in candidate_cells_chunk:
-        if cell == start_pos:
-            continue
-        if simulate_with_loop_detection(grid, start_pos, start_dir, cell):
+    for cell, pos, d, seed_states in candidate_cells_chunk:
+        if detector.is_loop(pos, d, cell, seed_states):
             count += 1
     result_list[index] = count
 
 
-def solve_part2_parallel(input_data, num_threads=10):
+BACKENDS = ("serial", "threads", "processes", "auto")
+
+# Per-process state for the process backend, set up by _init_process_worker
+_worker_shm = None
+_worker_detector = None
+
+
+def choose_backend():
+    # Threads only run in parallel on a free-threaded build with the GIL off
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)
+    return "processes" if is_gil_enabled() else "threads"
+
+
+def _init_process_worker(shm_name, size, width):
+    global _worker_shm, _worker_detector
+    if sys.version_info >= (3, 13):
+        # The parent owns the block; workers must not unlink it on exit
+        _worker_shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    else:
+        _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    # Index the padded grid in the shared block directly, without a copy
+    _worker_detector = LoopDetector(_worker_shm.buf[:size], width)
+
+
+def _process_candidate(candidate):
+    cell, pos, d, seed_states = candidate
+    return _worker_detector.is_loop(pos, d, cell, seed_states)
+
+
+def _solve_candidates_processes(grid, candidate_cells, num_workers):
+    # Workers index this padded grid in place; only its name is sent to them
+    cells, width = pad_grid(grid)
+    size = len(cells)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shm.buf[:size] = cells
+        del cells
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_process_worker,
+            initargs=(shm.name, size, width),
+        ) as executor:
+            # Small chunks are handed out as workers free up, so a few slow
+            # long-loop candidates do not hold up a whole static share
+            chunksize = max(1, len(candidate_cells) // (num_workers * 16))
+            return sum(
+                executor.map(_process_candidate, candidate_cells, chunksize=chunksize)
+            )
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def solve_part2_parallel(input_data, num_threads=10, backend="auto"):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
     grid, start_pos, start_dir = parse_grid(input_data)
-    _, moves = simulate_no_obstacle(grid, start_pos, start_dir)
-    candidate_cells = list(set(moves))
-
-    chunk_size = (len(candidate_cells) + num_threads - 1) // num_threads
+    candidate_cells = candidate_starts(grid, start_pos, start_dir)
+
+    if backend == "auto":
+        backend = choose_backend()
+    if backend == "serial":
+        results = [0]
+        worker(grid, candidate_cells, results, 0)
+        return results[0]
+    if backend == "processes":
+        num_workers = min(num_threads, os.cpu_count() or 1)
+        return _solve_candidates_processes(grid, candidate_cells, num_workers)
+
+    chunk_size = max(1, (len(candidate_cells) + num_threads - 1) // num_threads)
     chunks = [
         candidate_cells[i : i + chunk_size]
         for i in range(0, len(candidate_cells), chunk_size)
@@ -130,9 +368,7 @@ def solve_part2_parallel(input_data, num_threads=10):
     threads = []
 
     for i, chunk in enumerate(chunks):
-        t = threading.Thread(
-            target=worker, args=(grid, start_pos, start_dir, chunk, results, i)
-        )
+        t = threading.Thread(target=worker, args=(grid, chunk, results, i))
         threads.append(t)
         t.start()
 
@@ -144,27 +380,109 @@ def solve_part2_parallel(input_data, num_threads=10):
 
 def solve_part1(input_data):
     grid, start_pos, start_dir = parse_grid(input_data)
-    visited_count, _ = simulate_no_obstacle(grid, start_pos, start_dir)
+    visited_count = simulate_no_obstacle(grid, start_pos, start_dir)[0]
     return visited_count
 
 
 def solve_part2(input_data):
     grid, start_pos, start_dir = parse_grid(input_data)
-    _, moves = simulate_no_obstacle(grid, start_pos, start_dir)
-
-    candidate_cells = set(moves)
+    detector = LoopDetector.from_grid(grid)
     loop_count = 0
 
-    # Just check each candidate cell by simulating from scratch:
-    for cell in candidate_cells:
-        if cell == start_pos:
-            continue
-        if simulate_with_loop_detection(grid, start_pos, start_dir, cell):
+    # Check each candidate cell, resuming from the guard's first approach:
+    for cell, pos, d, seed_states in candidate_starts(grid, start_pos, start_dir):
+        if detector.is_loop(pos, d, cell, seed_states):
             loop_count += 1
 
     return loop_count
 
 
+def solve_part2_vectorized(input_data, batch_size=None, memory_budget=256 << 20):
+    """
+    Simulate a batch of candidate obstacles in lockstep with NumPy: every
+    guard instance advances one step per iteration, each with its own extra
+    obstacle and its own visited bitmap. Instances that leave the map or
+    revisit a state are compacted out of the active set.
+    Unless `batch_size` is given, it is as many instances as fit their
+    visited bitmaps in `memory_budget` bytes.
+    """
+    grid, start_pos, start_dir = parse_grid(input_data)
+    cols = len(grid[0])
+    cells, width = pad_grid(grid)
+    cells = np.frombuffer(bytes(cells), dtype=np.uint8)
+    deltas = np.array([DR[d] * width + DC[d] for d in range(4)], dtype=np.int64)
+    n_bytes = (len(cells) * 4 + 7) // 8
+    if batch_size is None:
+        batch_size = max(1, memory_budget // n_bytes)
+
+    def to_flat(r, c):
+        return (np.asarray(r, dtype=np.int64) + 1) * width + np.asarray(c) + 1
+
+    candidates = candidate_starts(grid, start_pos, start_dir)
+    loop_count = 0
+    for first in range(0, len(candidates), batch_size):
+        batch = candidates[first : first + batch_size]
+        n = len(batch)
+        obstacle = to_flat(
+            [cell[0] for cell, _, _, _ in batch], [cell[1] for cell, _, _, _ in batch]
+        )
+        pos = to_flat([p[0] for _, p, _, _ in batch], [p[1] for _, p, _, _ in batch])
+        d = np.array([d for _, _, d, _ in batch], dtype=np.int64)
+        row = np.arange(n)
+        visited = np.zeros((n, n_bytes), dtype=np.uint8)
+
+        # Seed each instance's bitmap with the states before its resume point
+        seed_counts = [len(seeds) for _, _, _, seeds in batch]
+        if sum(seed_counts):
+            seed_rows = np.repeat(row, seed_counts)
+            seeds = np.array(
+                [s for _, _, _, seeds in batch for s in seeds], dtype=np.int64
+            )
+            seed_cell, seed_d = np.divmod(seeds, 4)
+            seed_r, seed_c = np.divmod(seed_cell, cols)
+            seed_states = to_flat(seed_r, seed_c) * 4 + seed_d
+            np.bitwise_or.at(
+                visited,
+                (seed_rows, seed_states >> 3),
+                (1 << (seed_states & 7)).astype(np.uint8),
+            )
+
+        while len(row):
+            state = pos * 4 + d
+            byte = state >> 3
+            bit = (1 << (state & 7)).astype(np.uint8)
+            seen = (visited[row, byte] & bit) != 0
+            loop_count += int(seen.sum())
+            visited[row, byte] |= bit
+
+            nxt = pos + deltas[d]
+            ahead = cells[nxt]
+            blocked = (ahead == WALL) | (nxt == obstacle)
+            d = np.where(blocked, (d + 1) & 3, d)
+            pos = np.where(blocked, pos, nxt)
+
+            active = ~seen & (ahead != OUTSIDE)
+            if not active.all():
+                row, pos, d, obstacle = (
+                    row[active],
+                    pos[active],
+                    d[active],
+                    obstacle[active],
+                )
+    return loop_count
+
+
+def solve_part2_jumps(input_data):
+    grid, start_pos, start_dir = parse_grid(input_data)
+    jump_table = build_jump_table(grid)
+
+    loop_count = 0
+    for cell, pos, d, seed_states in candidate_starts(grid, start_pos, start_dir):
+        if simulate_with_jumps(grid, jump_table, pos, d, cell, seed_states):
+            loop_count += 1
+    return loop_count
+
+
 if __name__ == "__main__":
     py_version = float(".".join(sys.version.split()[0].split(".")[0:2]))
     status = sysconfig.get_config_var("Py_GIL_DISABLED")
@@ -177,6 +495,7 @@ if __name__ == "__main__":
         print("GIL is currently disabled")
     if status == 1:
         print("GIL is currently active")
+    print("Part 2 backend:", choose_backend())
 
     # Test sample
     sample_p1 = solve_part1(SAMPLE_DATA)
@@ -186,6 +505,13 @@ if __name__ == "__main__":
     sample_p2 = solve_part2_parallel(SAMPLE_DATA)
     print("Sample Part 2:", sample_p2)
     assert sample_p2 == 6
+    for backend in BACKENDS:
+        assert solve_part2_parallel(SAMPLE_DATA, backend=backend) == 6
+    assert solve_part2(SAMPLE_DATA) == 6
+    assert solve_part2_jumps(SAMPLE_DATA) == 6
+    assert solve_part2_vectorized(SAMPLE_DATA) == 6
+    assert solve_part2_vectorized(SAMPLE_DATA, batch_size=4) == 6
+    assert solve_part2_vectorized(SAMPLE_DATA, memory_budget=1) == 6
 
     puzzle = Puzzle(2024, 6)
     real_data = puzzle.input_data
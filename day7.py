@@ -1,4 +1,6 @@
-from concurrent.futures import ThreadPoolExecutor
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import os
 from aocd.models import Puzzle
 
 TEST_DATA = """190: 10 19
@@ -70,28 +72,205 @@ def can_achieve_target_iterative(target, numbers, allow_concatenation=False):
     return False
 
 
+def can_achieve_target_inverse(target, numbers, allow_concatenation=False):
+    """
+    Search backward from the target, undoing the last operator each step.
+    '*' is only undone when the target is divisible by the last number, '||'
+    only when the target ends in its digits and '+' only when the difference
+    stays non-negative, which prunes nearly every branch.
+    """
+    if not numbers:
+        return False
+
+    # 10 ** (digits of each number), for stripping a decimal suffix
+    powers = [10 ** len(str(n)) for n in numbers]
+    stack = [(target, len(numbers) - 1)]
+
+    while stack:
+        value, i = stack.pop()
+        if i == 0:
+            if value == numbers[0]:
+                return True
+            continue
+
+        current = numbers[i]
+
+        if value >= current:
+            stack.append((value - current, i - 1))
+
+        if current == 0:
+            # Multiplying by zero reaches 0 from any prefix
+            if value == 0:
+                return True
+        elif value % current == 0:
+            stack.append((value // current, i - 1))
+
+        if allow_concatenation and value % powers[i] == current:
+            stack.append((value // powers[i], i - 1))
+
+    return False
+
+
+# Equations with at least this many operands use the meet-in-the-middle solver
+MITM_MIN_OPERANDS = 20
+
+
+def can_achieve_target_mitm(
+    target, numbers, allow_concatenation=False, max_frontier=1 << 20
+):
+    """
+    Meet-in-the-middle: enumerate the values reachable forward over the first
+    half of the numbers, and the values the second half can turn into the
+    target by undoing operators backward from it, then intersect the two.
+    Falls back to can_achieve_target_inverse if either frontier grows past
+    `max_frontier` values.
+    """
+    if not numbers:
+        return False
+    split = max(1, len(numbers) // 2)
+    # Values above the target can only be dropped when no operand is zero
+    prune = 0 not in numbers
+
+    forward = {numbers[0]}
+    for next_num in numbers[1:split]:
+        new_values = set()
+        for val in forward:
+            new_values.add(val + next_num)
+            new_values.add(val * next_num)
+            if allow_concatenation:
+                new_values.add(int(str(val) + str(next_num)))
+        if prune:
+            new_values = {val for val in new_values if val <= target}
+        forward = new_values
+        if not forward:
+            return False
+        if len(forward) > max_frontier:
+            return can_achieve_target_inverse(target, numbers, allow_concatenation)
+
+    backward = {target}
+    for next_num in reversed(numbers[split:]):
+        power = 10 ** len(str(next_num))
+        new_values = set()
+        for val in backward:
+            if val >= next_num:
+                new_values.add(val - next_num)
+            if next_num == 0:
+                if val == 0:
+                    # Anything times zero is zero, so any prefix value works
+                    return True
+            elif val % next_num == 0:
+                new_values.add(val // next_num)
+            if allow_concatenation and val % power == next_num:
+                new_values.add(val // power)
+        backward = new_values
+        if not backward:
+            return False
+        if len(backward) > max_frontier:
+            return can_achieve_target_inverse(target, numbers, allow_concatenation)
+
+    return not forward.isdisjoint(backward)
+
+
+def solve_equation(target, numbers, allow_concatenation=False):
+    if len(numbers) >= MITM_MIN_OPERANDS:
+        return can_achieve_target_mitm(target, numbers, allow_concatenation)
+    return can_achieve_target_inverse(target, numbers, allow_concatenation)
+
+
 def process_line(line, allow_concatenation=False):
     if not line.strip():
         return 0
     lhs, rhs = line.split(":")
     target = int(lhs.strip())
     numbers = list(map(int, rhs.strip().split()))
-    return (
-        target
-        if can_achieve_target_iterative(target, numbers, allow_concatenation)
-        else 0
-    )
+    return target if solve_equation(target, numbers, allow_concatenation) else 0
+
+
+def parse_equations(data):
+    """
+    Parse every equation once: targets as Python ints (they often pass
+    int64), plus all operands in one flat array with
+    offsets[i]:offsets[i + 1] belonging to equation i. Operands are packed
+    as int64 unless one does not fit, in which case they stay a list.
+    """
+    targets = []
+    values = array("q")
+    offsets = array("q", [0])
+    for line in data.strip().split("\n"):
+        if not line.strip():
+            continue
+        lhs, rhs = line.split(":")
+        targets.append(int(lhs.strip()))
+        numbers = list(map(int, rhs.strip().split()))
+        try:
+            values.extend(numbers)
+        except OverflowError:
+            del values[offsets[-1] :]
+            values = list(values) + numbers
+        offsets.append(len(values))
+    return targets, values, offsets
+
+
+def evaluate_equations(targets, values, offsets):
+    """
+    Solve a run of equations. Returns one byte per equation: 1 if solvable
+    with '+' and '*' only, 2 if it also needs '||', 0 if not solvable.
+    """
+    results = bytearray(len(targets))
+    for i, target in enumerate(targets):
+        numbers = list(values[offsets[i] : offsets[i + 1]])
+        if solve_equation(target, numbers):
+            results[i] = 1
+        elif solve_equation(target, numbers, allow_concatenation=True):
+            results[i] = 2
+    return results
+
+
+def _equation_chunks(targets, values, offsets, chunk_weight):
+    # Longer equations cost more, so chunks hold a similar number of operands
+    start = 0
+    while start < len(targets):
+        end = start + 1
+        while end < len(targets) and offsets[end] - offsets[start] < chunk_weight:
+            end += 1
+        base = offsets[start]
+        yield (
+            targets[start:end],
+            values[base : offsets[end]],
+            array("q", (offset - base for offset in offsets[start : end + 1])),
+        )
+        start = end
+
+
+def solve_batch(data, workers=None):
+    """
+    Evaluate every equation once in a process pool and return both parts:
+    (sum of targets solvable without '||', sum of targets solvable with it).
+    """
+    targets, values, offsets = parse_equations(data)
+    workers = workers or os.cpu_count() or 1
+    chunk_weight = max(1, len(values) // (workers * 8))
+    chunks = list(_equation_chunks(targets, values, offsets, chunk_weight))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(evaluate_equations, *zip(*chunks)) if chunks else []
+        total_part1 = 0
+        total_part2 = 0
+        for chunk, flags in zip(chunks, results):
+            for target, flag in zip(chunk[0], flags):
+                if flag == 1:
+                    total_part1 += target
+                if flag:
+                    total_part2 += target
+    return total_part1, total_part2
 
 
 def solve_with_data(data, allow_concatenation=False, parallel=True):
-    lines = data.strip().split("\n")
     if parallel:
-        with ThreadPoolExecutor() as executor:
-            results = list(
-                executor.map(lambda l: process_line(l, allow_concatenation), lines)
-            )
-        return sum(results)
+        total_part1, total_part2 = solve_batch(data)
+        return total_part2 if allow_concatenation else total_part1
     else:
+        lines = data.strip().split("\n")
         total = 0
         for line in lines:
             total += process_line(line, allow_concatenation)
@@ -109,16 +288,28 @@ if __name__ == "__main__":
     assert test_part2 == 11387, f"Expected 11387, got {test_part2}"
     print("Part 2 Test passed!")
 
+    assert solve_batch(TEST_DATA, workers=2) == (3749, 11387)
+    big = int("9" * 21)
+    big_data = f"{big}: {' '.join(['9'] * 21)}\n{big}: {big} 1\n"
+    assert solve_batch(big_data, workers=2) == (big, 2 * big)
+    assert solve_with_data(big_data, True) == solve_with_data(big_data, True, False)
+    for line in TEST_DATA.strip().split("\n"):
+        lhs, rhs = line.split(":")
+        target, numbers = int(lhs), list(map(int, rhs.split()))
+        for concat in (False, True):
+            expected = can_achieve_target_inverse(target, numbers, concat)
+            assert can_achieve_target_mitm(target, numbers, concat) == expected
+            assert can_achieve_target_mitm(target, numbers, concat, 1) == expected
+    assert solve_with_data(TEST_DATA, parallel=False) == 3749
+
     # Solve real data
     puzzle = Puzzle(year=2024, day=7)
     real_data = puzzle.input_data
 
-    # Part 1 answer
-    p1 = solve_with_data(real_data, allow_concatenation=False, parallel=True)
+    # Both answers from one pass over the equations
+    p1, p2 = solve_batch(real_data)
     print("Part 1 Answer:", p1)
     puzzle.answer_a = p1
 
-    # Part 2 answer
-    p2 = solve_with_data(real_data, allow_concatenation=True, parallel=True)
     print("Part 2 Answer:", p2)
     puzzle.answer_b = p2
@@ -22,6 +22,8 @@ TEST_INPUT_2 = """T....#....
 ....#.....
 .........."""
 
+import math
+
 import numpy as np
 
 
@@ -36,22 +38,32 @@ def parse_map(data):
     return lines, antennas
 
 
-def find_collinear_points(p1, p2, max_y, max_x):
-    y1, x1 = p1
-    y2, x2 = p2
+def line_key(p1, p2):
+    """Canonical (dy, dx, offset) identifying the grid line through p1 and p2."""
+    (y1, x1), (y2, x2) = p1, p2
+    dy, dx = y2 - y1, x2 - x1
+    g = math.gcd(dy, dx)
+    dy, dx = dy // g, dx // g
+    if dy < 0 or (dy == 0 and dx < 0):
+        dy, dx = -dy, -dx
+    # dx * y - dy * x is the same for every point on the line
+    return dy, dx, dx * y1 - dy * x1
 
-    y_coords, x_coords = np.meshgrid(np.arange(max_y), np.arange(max_x), indexing="ij")
-    points = np.stack([y_coords, x_coords], axis=-1).reshape(-1, 2)
 
-    v1 = np.array([y2 - y1, x2 - x1, 0])
-    v2 = np.column_stack([points - np.array([y1, x1]), np.zeros(len(points))])
-
-    cross_products = np.cross(v1, v2)
+def find_collinear_points(p1, p2, max_y, max_x):
+    # Step along the line with the gcd-reduced direction, so only the cells
+    # on the line are visited
+    y1, x1 = p1
+    dy, dx, _ = line_key(p1, p2)
 
-    collinear_mask = np.all(np.abs(cross_products) < 1e-10, axis=1)
-    collinear_points = points[collinear_mask]
+    while 0 <= y1 - dy < max_y and 0 <= x1 - dx < max_x:
+        y1, x1 = y1 - dy, x1 - dx
 
-    return {tuple(point) for point in collinear_points}
+    points = set()
+    while 0 <= y1 < max_y and 0 <= x1 < max_x:
+        points.add((y1, x1))
+        y1, x1 = y1 + dy, x1 + dx
+    return points
 
 
 def find_antinodes(lines, antennas):
@@ -68,6 +80,8 @@ def find_antinodes(lines, antennas):
         n = len(coords)
         if n < 2:
             continue
+        # Lines already walked for this frequency
+        lines_seen = set()
 
         for i in range(n):
             y1, x1 = coords[i]
@@ -85,12 +99,177 @@ def find_antinodes(lines, antennas):
                 if 0 <= C2y < max_y and 0 <= C2x < max_x:
                     antinode_set_1.add((C2y, C2x))
 
-                collinear = find_collinear_points(p1, p2, max_y, max_x)
-                antinode_set_2.update(collinear)
+                key = line_key(p1, p2)
+                if key not in lines_seen:
+                    lines_seen.add(key)
+                    collinear = find_collinear_points(p1, p2, max_y, max_x)
+                    antinode_set_2.update(collinear)
 
     return antinode_set_1, antinode_set_2
 
 
+def _step_range(start, step, size):
+    """
+    Per line, the lowest and highest k with 0 <= start + k * step < size.
+    Lines with a zero step stay inside for every k; their range is left to
+    the other axis, so it is returned as the whole int64 range.
+    """
+    safe = np.where(step == 0, 1, step)
+    # Bounds of k * step, then divided by step rounding inwards
+    low = -start
+    high = size - 1 - start
+    lo = np.where(step > 0, -(-low // safe), -(-high // safe))
+    hi = np.where(step > 0, high // safe, low // safe)
+    unbounded = np.iinfo(np.int64)
+    lo = np.where(step == 0, unbounded.min, lo)
+    hi = np.where(step == 0, unbounded.max, hi)
+    return lo, hi
+
+
+def find_antinodes_bitmap(lines, antennas, max_points=1 << 20):
+    """
+    Same antinodes as find_antinodes, as boolean H x W bitmaps. Each
+    frequency's antennas are one coordinate array, and all of its pairs are
+    handled with broadcasting instead of a Python loop.
+    For part 2, pairs on the same line are reduced to one line (see
+    line_key), each line is clipped to its in-bounds steps, and lines are
+    expanded at most `max_points` points at a time.
+    """
+    freq_dict = {}
+    for f, y, x in antennas:
+        freq_dict.setdefault(f, []).append((y, x))
+
+    max_y = len(lines)
+    max_x = len(lines[0])
+    bitmap_1 = np.zeros((max_y, max_x), dtype=bool)
+    bitmap_2 = np.zeros((max_y, max_x), dtype=bool)
+
+    for coords in freq_dict.values():
+        if len(coords) < 2:
+            continue
+        coords = np.array(coords, dtype=np.int64)
+        i, j = np.nonzero(~np.eye(len(coords), dtype=bool))
+
+        # Part 1: the point past each antenna, away from the other one
+        points = 2 * coords[i] - coords[j]
+        inside = (
+            (points[:, 0] >= 0)
+            & (points[:, 0] < max_y)
+            & (points[:, 1] >= 0)
+            & (points[:, 1] < max_x)
+        )
+        bitmap_1[points[inside, 0], points[inside, 1]] = True
+
+        # Part 2: one entry per distinct line, keyed like line_key
+        upper = i < j
+        origins = coords[i[upper]]
+        diffs = coords[j[upper]] - origins
+        g = np.gcd(diffs[:, 0], diffs[:, 1])
+        dy, dx = diffs[:, 0] // g, diffs[:, 1] // g
+        flip = (dy < 0) | ((dy == 0) & (dx < 0))
+        dy, dx = np.where(flip, -dy, dy), np.where(flip, -dx, dx)
+        keys = np.stack([dy, dx, dx * origins[:, 0] - dy * origins[:, 1]], axis=1)
+        _, first = np.unique(keys, axis=0, return_index=True)
+        origins, dy, dx = origins[first], dy[first], dx[first]
+
+        # Clip each line to the steps that stay on the map
+        lo_y, hi_y = _step_range(origins[:, 0], dy, max_y)
+        lo_x, hi_x = _step_range(origins[:, 1], dx, max_x)
+        k_lo = np.maximum(lo_y, lo_x)
+        counts = np.minimum(hi_y, hi_x) - k_lo + 1
+        ends = np.cumsum(counts)
+
+        start = 0
+        while start < len(counts):
+            # Take whole lines until the chunk holds max_points points
+            done = ends[start - 1] if start else 0
+            stop = max(
+                start + 1, int(np.searchsorted(ends, done + max_points, side="right"))
+            )
+            chunk_counts = counts[start:stop]
+            line = np.repeat(np.arange(start, stop), chunk_counts)
+            first_point = np.repeat(ends[start:stop] - chunk_counts, chunk_counts)
+            k = k_lo[line] + np.arange(len(line)) + done - first_point
+            bitmap_2[
+                origins[line, 0] + k * dy[line], origins[line, 1] + k * dx[line]
+            ] = True
+            start = stop
+
+    return bitmap_1, bitmap_2
+
+
+def count_antinodes(lines, antennas):
+    bitmap_1, bitmap_2 = find_antinodes_bitmap(lines, antennas)
+    return int(np.count_nonzero(bitmap_1)), int(np.count_nonzero(bitmap_2))
+
+
+class AntennaField:
+    """
+    Antennas on a fixed-size map with live antinode counts for both parts.
+    Each cell keeps a reference count of the antenna pairs that put an
+    antinode there, so adding or removing an antenna only touches the pairs
+    it belongs to.
+    """
+
+    def __init__(self, max_y, max_x):
+        self.max_y = max_y
+        self.max_x = max_x
+        self.frequencies = {}
+        self.occupied = {}
+        self.refcount_1 = np.zeros((max_y, max_x), dtype=np.int32)
+        self.refcount_2 = np.zeros((max_y, max_x), dtype=np.int32)
+        self.count_1 = 0
+        self.count_2 = 0
+
+    @classmethod
+    def from_map(cls, data):
+        lines, antennas = parse_map(data)
+        field = cls(len(lines), len(lines[0]))
+        for f, y, x in antennas:
+            field.add_antenna(f, y, x)
+        return field
+
+    def _update(self, refcount, points, delta):
+        # Returns the change in the number of cells with a non-zero count
+        if not points:
+            return 0
+        ys, xs = np.array(list(points), dtype=np.int64).T
+        before = refcount[ys, xs]
+        refcount[ys, xs] = before + delta
+        if delta > 0:
+            return int(np.count_nonzero(before == 0))
+        return -int(np.count_nonzero(before + delta == 0))
+
+    def _apply_pair(self, p1, p2, delta):
+        (y1, x1), (y2, x2) = p1, p2
+        points_1 = {
+            (y, x)
+            for y, x in ((2 * y1 - y2, 2 * x1 - x2), (2 * y2 - y1, 2 * x2 - x1))
+            if 0 <= y < self.max_y and 0 <= x < self.max_x
+        }
+        self.count_1 += self._update(self.refcount_1, points_1, delta)
+        points_2 = find_collinear_points(p1, p2, self.max_y, self.max_x)
+        self.count_2 += self._update(self.refcount_2, points_2, delta)
+
+    def add_antenna(self, f, y, x):
+        if not (0 <= y < self.max_y and 0 <= x < self.max_x):
+            raise ValueError(f"Antenna at {(y, x)} is outside the map")
+        if (y, x) in self.occupied:
+            raise ValueError(f"Cell {(y, x)} already has an antenna")
+        coords = self.frequencies.setdefault(f, set())
+        for other in coords:
+            self._apply_pair((y, x), other, 1)
+        coords.add((y, x))
+        self.occupied[(y, x)] = f
+
+    def remove_antenna(self, y, x):
+        f = self.occupied.pop((y, x))
+        coords = self.frequencies[f]
+        coords.remove((y, x))
+        for other in coords:
+            self._apply_pair((y, x), other, -1)
+
+
 def test_with_sample_data():
     lines, antennas = parse_map(TEST_INPUT)
 
@@ -102,6 +281,18 @@ def test_with_sample_data():
     _, antinodes_p2_2 = find_antinodes(lines2, antennas2)
     assert len(antinodes_p2_2) == 9, f"Part 2: Expected 9, got {len(antinodes_p2_2)}"
 
+    assert count_antinodes(lines, antennas) == (14, 34)
+    assert count_antinodes(lines2, antennas2)[1] == 9
+
+    field = AntennaField.from_map(TEST_INPUT)
+    assert (field.count_1, field.count_2) == (14, 34)
+    field.remove_antenna(5, 6)
+    remaining = [a for a in antennas if a != ("A", 5, 6)]
+    expected = count_antinodes(lines, remaining)
+    assert (field.count_1, field.count_2) == expected
+    field.add_antenna("A", 5, 6)
+    assert (field.count_1, field.count_2) == (14, 34)
+
 
 def solve_real_data():
     from aocd.models import Puzzle
@@ -111,11 +302,9 @@ def solve_real_data():
 
     lines, antennas = parse_map(data)
 
-    antinodes_p1, antinodes_p2 = find_antinodes(lines, antennas)
-    p1 = len(antinodes_p1)
+    p1, p2 = count_antinodes(lines, antennas)
     print("Part 1:", p1, "antinodes")
     puzzle.answer_a = p1
-    p2 = len(antinodes_p2)
     print("Part 2:", p2, "antinodes")
     puzzle.answer_b = p2
 
@@ -1,14 +1,20 @@
+import heapq
+from array import array
+
 from aocd.models import Puzzle
 
 SAMPLE_DATA = "2333133121414131402"
 
+# Marker for a free block; file blocks hold their file ID
+FREE = -1
+
 
 def parse_disk_map(data):
     # Parse the input string into alternating file/free lengths
     # Digits alternate between file-length and free-length.
     # If there's an odd number of digits, the last one is just a file-length with no trailing free.
     lengths = [int(x) for x in data]
-    disk = []
+    disk = array("i")
     file_id = 0
     is_file = True
     i = 0
@@ -16,13 +22,13 @@ def parse_disk_map(data):
         if is_file:
             # file length
             flen = lengths[i]
-            disk.extend([str(file_id)] * flen)
+            disk.extend(array("i", [file_id]) * flen)
             file_id += 1
             i += 1
         else:
             # free length
             freelen = lengths[i]
-            disk.extend(["."] * freelen)
+            disk.extend(array("i", [FREE]) * freelen)
             i += 1
         is_file = not is_file
     return disk
@@ -31,41 +37,20 @@ def parse_disk_map(data):
 def compact_disk(disk):
     # The process:
     # Move file blocks one at a time from the end of the disk to the leftmost free space block,
-    # until there are no gaps ('.') remaining between file blocks.
-    # A gap is defined as a '.' that appears before at least one file block to its right.
-
-    # Find the initial rightmost file block
-    rightmost_file_index = len(disk) - 1
-    while rightmost_file_index >= 0 and disk[rightmost_file_index] == ".":
-        rightmost_file_index -= 1
-
-    # Maintain a list of indices for dots
-    dot_indices = [i for i, c in enumerate(disk) if c == "."]
-
-    while rightmost_file_index > 0 and dot_indices:
-        # Find the first '.' that has a file block to its right
-        dot_index = -1
-        for idx in dot_indices:
-            if idx < rightmost_file_index:
-                dot_index = idx
-                break
-
-        if dot_index == -1:
-            # No suitable '.' found, we are done
+    # until there are no gaps (FREE) remaining between file blocks.
+    # A single pass with one pointer moving right over free blocks and one
+    # moving left over file blocks does every move in O(n).
+    left = 0
+    right = len(disk) - 1
+    while True:
+        while left < right and disk[left] != FREE:
+            left += 1
+        while left < right and disk[right] == FREE:
+            right -= 1
+        if left >= right:
             break
-
-        # Move the rightmost file block to the '.' position
-        disk[dot_index] = disk[rightmost_file_index]
-        disk[rightmost_file_index] = "."
-
-        # Update the rightmost file index
-        rightmost_file_index -= 1
-        while rightmost_file_index >= 0 and disk[rightmost_file_index] == ".":
-            rightmost_file_index -= 1
-
-        # Update the list of dot indices
-        dot_indices.remove(dot_index)
-        dot_indices.append(rightmost_file_index)
+        disk[left] = disk[right]
+        disk[right] = FREE
 
     return disk
 
@@ -80,18 +65,18 @@ def find_file_spans(disk):
     span_start = None
 
     for i, c in enumerate(disk):
-        if c == ".":
+        if c == FREE:
             if file_id is not None:
                 # End of a file span
                 spans.append((file_id, span_start, i - span_start))
                 file_id = None
         else:
-            if file_id != int(c):
+            if file_id != c:
                 if file_id is not None:
                     # End of previous file span
                     spans.append((file_id, span_start, i - span_start))
                 # Start of new file span
-                file_id = int(c)
+                file_id = c
                 span_start = i
 
     # Handle last span if it exists
@@ -107,7 +92,7 @@ def find_free_spans(disk):
     span_start = None
 
     for i, c in enumerate(disk):
-        if c == ".":
+        if c == FREE:
             if span_start is None:
                 span_start = i
         else:
@@ -127,31 +112,45 @@ def compact_disk_part2(disk):
     Compact the disk by moving whole files to the leftmost possible position.
     Process files in order of decreasing file ID.
     """
-    # Convert disk to list for modification
-    disk = list(disk)
+    # Copy the disk for modification
+    disk = array("i", disk)
 
     # Get file spans and sort by file ID in descending order
     file_spans = find_file_spans(disk)
     file_spans.sort(key=lambda x: x[0], reverse=True)
 
-    for file_id, start_pos, length in file_spans:
-        # Find all free spans
-        free_spans = find_free_spans(disk)
+    # Index free spans once: free_heaps[n] is a min-heap of the start
+    # positions of free spans of exactly n blocks
+    free_spans = find_free_spans(disk)
+    max_free = max((free_length for _, free_length in free_spans), default=0)
+    free_heaps = [[] for _ in range(max_free + 1)]
+    for free_start, free_length in free_spans:
+        free_heaps[free_length].append(free_start)
+    for heap in free_heaps:
+        heapq.heapify(heap)
 
-        # Find leftmost free span that can fit this file
+    for file_id, start_pos, length in file_spans:
+        # Leftmost free span that can fit this file: the smallest heap top
+        # among the buckets of spans at least as long as the file
         target_span = None
-        for free_start, free_length in free_spans:
-            if free_length >= length and free_start < start_pos:
-                target_span = (free_start, free_length)
-                break
+        for free_length in range(length, max_free + 1):
+            heap = free_heaps[free_length]
+            if heap and heap[0] < start_pos:
+                if target_span is None or heap[0] < target_span[0]:
+                    target_span = (heap[0], free_length)
 
         if target_span is not None:
+            free_start, free_length = target_span
+            heapq.heappop(free_heaps[free_length])
+            # Whatever the file leaves over stays free, in its new bucket
+            if free_length > length:
+                heapq.heappush(free_heaps[free_length - length], free_start + length)
             # Move the file to the new position
             file_content = disk[start_pos : start_pos + length]
             # Clear old position
-            disk[start_pos : start_pos + length] = ["."] * length
+            disk[start_pos : start_pos + length] = array("i", [FREE]) * length
             # Place file in new position
-            disk[target_span[0] : target_span[0] + length] = file_content
+            disk[free_start : free_start + length] = file_content
 
     return disk
 
@@ -159,9 +158,8 @@ def compact_disk_part2(disk):
 def compute_checksum(disk):
     # sum of (position * file_id) for each file block
     total = 0
-    for pos, c in enumerate(disk):
-        if c != ".":
-            file_id = int(c)
+    for pos, file_id in enumerate(disk):
+        if file_id != FREE:
             total += pos * file_id
     return total
 
@@ -172,12 +170,12 @@ def solve(data):
 
     # Solve Part 1
     print("Compacting disk (Part 1)")
-    disk_p1 = compact_disk(disk.copy())
+    disk_p1 = compact_disk(disk[:])
     checksum_p1 = compute_checksum(disk_p1)
 
     # Solve Part 2
     print("Compacting disk (Part 2)")
-    disk_p2 = compact_disk_part2(disk.copy())
+    disk_p2 = compact_disk_part2(disk[:])
     checksum_p2 = compute_checksum(disk_p2)
 
     return checksum_p1, checksum_p2